@@ -0,0 +1,109 @@
+"""
+Peak-memory benchmark for the scrapers: default mode vs memory_bounded_scrape.
+
+Serves a synthetic listing page (job cards plus the surrounding markup real boards carry)
+to scrape_jobicy() through a stubbed requests session, scraping several pages from
+concurrent threads the way a paginated or parallel cycle would, and reports the
+tracemalloc peak for each mode.
+
+Two scenarios run: many cards per page within the in-flight budget, and large pages
+whose combined size goes over SCRAPE_INFLIGHT_BYTES_BUDGET, which must queue for budget
+rather than hang.
+
+Usage: python bench_scrape_memory.py
+"""
+import gc
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import requests
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO_DIR)
+
+# (cards per page, extra inline script bytes per page, concurrent pages)
+SCENARIOS = [
+    (500, 0, 4),
+    (200, int(4.5 * 1024 * 1024), 6),
+]
+
+# A scenario counts as hung if its threads haven't finished by then
+HANG_TIMEOUT_SECONDS = 300
+
+def build_page(cards, padding=0):
+    """A listing page: `cards` job cards among navigation, scripts and filler, like a real board."""
+    filler = "<div class='nav'>" + "<a href='/x'>link</a>" * 200 + "</div>"
+    script = "<script>" + "var x = 1;" * (5000 + padding // 10) + "</script>"
+    card = ("<div class='job-card'><h2 class='job-card__title'>Python Developer {i}</h2>"
+            "<p class='job-card__company'>Company {i}</p><a href='/jobs/{i}'>View</a>"
+            "<div class='tags'>" + "<span>tag</span>" * 20 + "</div></div>")
+    body = "".join(card.format(i=i) + "<div class='ad'>" + "<p>promo</p>" * 10 + "</div>" for i in range(cards))
+    return f"<html><head>{script}</head><body>{filler}{body}{filler}</body></html>".encode()
+
+class FakeResponse:
+    def __init__(self, body):
+        self.content = body
+        self.headers = {"Content-Length": str(len(body))}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+def run(main, page, pages, bounded):
+    main.get_current_config = lambda: {"memory_bounded_scrape": bounded}
+    requests.Session.get = lambda self, url, **kwargs: FakeResponse(page)
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=main.scrape_jobicy, args=("python", "remote")) for _ in range(pages)]
+    for t in threads:
+        t.start()
+    deadline = start + HANG_TIMEOUT_SECONDS
+    for t in threads:
+        t.join(timeout=max(0, deadline - time.perf_counter()))
+    hung = any(t.is_alive() for t in threads)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed, hung
+
+def main():
+    # Import from a scratch dir so any startup side effects stay out of the repo
+    os.chdir(tempfile.mkdtemp())
+    import logging
+    import main as jobbot
+    logging.getLogger(jobbot.__name__).setLevel(logging.ERROR)
+    budget = jobbot.SCRAPE_INFLIGHT_BYTES_BUDGET
+
+    for cards, padding, pages in SCENARIOS:
+        page = build_page(cards, padding)
+        total = len(page) * pages
+        print(f"{pages} concurrent pages x {len(page) / 1024 / 1024:.1f} MiB, {cards} cards each "
+              f"({total / 1024 / 1024:.1f} MiB total, {'over' if total > budget else 'within'} the "
+              f"{budget / 1024 / 1024:.0f} MiB in-flight budget)")
+        results = {}
+        for name, bounded in (("default", False), ("bounded", True)):
+            peak, elapsed, hung = run(jobbot, page, pages, bounded)
+            if hung:
+                print(f"{name:>8}: HUNG (threads still running after {HANG_TIMEOUT_SECONDS} s)")
+                os._exit(1)
+            results[name] = peak
+            print(f"{name:>8}: peak {peak / 1024 / 1024:7.1f} MiB  in {elapsed:5.2f} s")
+        print(f"  saving: {(1 - results['bounded'] / results['default']) * 100:5.1f}% of peak\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Cold-start benchmark for main.py.
+
+Starts a fresh interpreter per run (like a container restart or a new gunicorn worker)
+and times importing main plus create_app(). The "eager" variant imports requests and bs4
+up front the way main.py used to; "lazy" is the current startup path, which defers them
+to the first scrape.
+
+Usage: python bench_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+VARIANTS = {
+    "eager": "import requests, bs4; import main; main.create_app()",
+    "lazy": "import main; main.create_app()",
+}
+
+def time_cold_start(code, workdir):
+    """Wall-clock seconds for a fresh interpreter to run `code`."""
+    env = dict(os.environ, PYTHONPATH=REPO_DIR, PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=workdir, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    # Run from a scratch dir so startup side effects (resumes/, jobqueue.db) don't touch the repo
+    with tempfile.TemporaryDirectory() as workdir:
+        # Warm the OS file cache so the first variant isn't penalised
+        time_cold_start(VARIANTS["eager"], workdir)
+        results = {}
+        for name, code in VARIANTS.items():
+            results[name] = [time_cold_start(code, workdir) for _ in range(runs)]
+
+    for name, samples in results.items():
+        print(f"{name:>6}: median {statistics.median(samples) * 1000:7.1f} ms  "
+              f"min {min(samples) * 1000:7.1f} ms  ({runs} runs)")
+    gain = statistics.median(results["eager"]) - statistics.median(results["lazy"])
+    print(f"  gain: {gain * 1000:7.1f} ms per cold start")
+
+if __name__ == "__main__":
+    main()
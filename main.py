@@ -1,16 +1,23 @@
 import os
 import time
 import csv
+import contextlib
+import contextvars
 import json
 import logging
 import datetime
 import threading
-import requests
-from flask import Flask, request, send_file, render_template_string
-from bs4 import BeautifulSoup
+from flask import Flask, Response, request, send_file, send_from_directory, render_template_string, stream_with_context
 from datetime import datetime
+import io
 import uuid
 import urllib.parse
+import hashlib
+import socket
+import sqlite3
+import sys
+import fcntl
+from concurrent.futures import ThreadPoolExecutor
 
 # --- Configuration and Logging ---
 
@@ -20,44 +27,124 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-# Load initial config
+# Initial config, loaded by create_app()
 CONFIG_FILE = "config.json"
-try:
-    with open(CONFIG_FILE) as f:
-        config = json.load(f)
-    logger.info(f"Loaded initial config from {CONFIG_FILE}")
-except FileNotFoundError:
-    config = {"keywords": [], "max_results": 50, "resume_path": "resumes/default_resume.pdf", "user_data": {}}
-    logger.warning(f"Config file {CONFIG_FILE} not found. Initialized with default config.")
-except json.JSONDecodeError:
-    config = {"keywords": [], "max_results": 50, "resume_path": "resumes/default_resume.pdf", "user_data": {}}
-    logger.error(f"Error decoding {CONFIG_FILE}. Initialized with default config.")
-except Exception as e:
-    config = {"keywords": [], "max_results": 50, "resume_path": "resumes/default_resume.pdf", "user_data": {}}
-    logger.error(f"An unexpected error occurred loading config: {e}. Initialized with default config.")
+config = {}
 
 # Path for applied jobs CSV
 CSV_PATH = "applied_jobs.csv"
+APPLIED_JOBS_FIELDS = ["timestamp", "title", "company", "url"]
+
+# History views: rows per page on the index and the download formats we stream
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 500
+HISTORY_MIMETYPES = {"csv": "text/csv", "json": "application/json", "ndjson": "application/x-ndjson"}
+
+# Content-addressed cache for fetched job detail pages
+DETAIL_CACHE_DIR = os.path.join("cache", "details")
+DEFAULT_DETAIL_CACHE_TTL_HOURS = 72
+# Failed or unparseable detail pages are cached too, but only this long, so they're retried soon
+DETAIL_FAILURE_TTL_HOURS = 2
+DEFAULT_ENRICH_WORKERS = 4
+
+# SQLite-backed queue for work handed off from web requests (e.g. Tally submissions).
+# In distributed mode every worker must point JOBBOT_QUEUE_DB at the same file (e.g. a shared volume).
+QUEUE_DB_PATH = os.environ.get("JOBBOT_QUEUE_DB", "jobqueue.db")
+QUEUE_POLL_SECONDS = 5
+QUEUE_LEASE_SECONDS = 600
+QUEUE_MAX_ATTEMPTS = 3
+QUEUE_RETRY_BACKOFF_SECONDS = 30
+# Finished (done/failed) jobs, Tally payloads included, are deleted after config["queue_retention_hours"].
+# Never less than the minimum, so idempotency keys outlast Tally's redeliveries of a webhook.
+DEFAULT_QUEUE_RETENTION_HOURS = 7 * 24
+QUEUE_MIN_RETENTION_HOURS = 48
+QUEUE_PURGE_INTERVAL_SECONDS = 3600
+APPLICATION_LOG_MAX_ROWS = 1000
+SCRAPE_HOST_DELAY_SECONDS = 2
+
+# Uploaded resumes are streamed into a content-addressed store under resumes/
+RESUME_STORE_DIR = os.path.join("resumes", "store")
+RESUME_CHUNK_SIZE = 64 * 1024
+RESUME_MAX_BYTES = 10 * 1024 * 1024
+
+# Search query planning: per-query yield stats and when to stop running empty queries
+QUERY_STATS_PATH = "query_stats.json"
+QUERY_PRUNE_AFTER_EMPTY_RUNS = 3
+QUERY_REPROBE_HOURS = 72
+OR_GROUP_SIZE = 3
+
+# Memory-bounded scrape mode (config["memory_bounded_scrape"]): per-page cap and global in-flight budget
+SCRAPE_CHUNK_SIZE = 64 * 1024
+SCRAPE_MAX_PAGE_BYTES = 5 * 1024 * 1024
+SCRAPE_INFLIGHT_BYTES_BUDGET = 16 * 1024 * 1024 # Room for budget // per-page cap = 3 max-size pages at once
+
+# Checkpoints of running local cycles (one <cycle_id>.json each), so a restart resumes them instead of re-scraping
+CYCLE_CHECKPOINT_DIR = "checkpoints"
+DEFAULT_CHECKPOINT_MAX_AGE_HOURS = 6
+
+# On-demand cycle profiling artifacts (collapsed stacks / pstats / per-stage timings)
+PROFILE_DIR = "profiles"
+PROFILE_SAMPLE_INTERVAL = 0.005
+PROFILE_MODES = {"1": "sample", "sample": "sample", "pstats": "pstats"}
 
-# Ensure resumes directory exists
-if not os.path.exists("resumes"):
-    os.makedirs("resumes")
-    logger.info("Created 'resumes' directory.")
-
-# Create a dummy default resume if it doesn't exist
 DEFAULT_RESUME_PATH = "resumes/default_resume.pdf"
-if not os.path.exists(DEFAULT_RESUME_PATH):
-    try:
-        from reportlab.pdfgen import canvas
-        c = canvas.Canvas(DEFAULT_RESUME_PATH)
-        c.drawString(100, 750, "This is a default resume. Please upload your own!")
-        c.save()
-        logger.info(f"Created a dummy default resume at {DEFAULT_RESUME_PATH}.")
-    except ImportError:
-        logger.warning(f"reportlab not installed. Please manually create a dummy PDF at {DEFAULT_RESUME_PATH} if you don't upload a resume via Tally.")
+
+# --- Startup ---
+
+def load_initial_config():
+    """Loads config.json into the module-level config, falling back to defaults."""
+    global config
+    try:
+        with open(CONFIG_FILE) as f:
+            config = json.load(f)
+        logger.info(f"Loaded initial config from {CONFIG_FILE}")
+    except FileNotFoundError:
+        config = {"keywords": [], "max_results": 50, "resume_path": DEFAULT_RESUME_PATH, "user_data": {}}
+        logger.warning(f"Config file {CONFIG_FILE} not found. Initialized with default config.")
+    except json.JSONDecodeError:
+        config = {"keywords": [], "max_results": 50, "resume_path": DEFAULT_RESUME_PATH, "user_data": {}}
+        logger.error(f"Error decoding {CONFIG_FILE}. Initialized with default config.")
     except Exception as e:
-        logger.error(f"Failed to create default resume PDF: {e}")
+        config = {"keywords": [], "max_results": 50, "resume_path": DEFAULT_RESUME_PATH, "user_data": {}}
+        logger.error(f"An unexpected error occurred loading config: {e}. Initialized with default config.")
+
+def ensure_default_resume():
+    """Creates the resumes directory and a dummy default resume if they don't exist."""
+    if not os.path.exists("resumes"):
+        os.makedirs("resumes")
+        logger.info("Created 'resumes' directory.")
 
+    if not os.path.exists(DEFAULT_RESUME_PATH):
+        try:
+            from reportlab.pdfgen import canvas
+            c = canvas.Canvas(DEFAULT_RESUME_PATH)
+            c.drawString(100, 750, "This is a default resume. Please upload your own!")
+            c.save()
+            logger.info(f"Created a dummy default resume at {DEFAULT_RESUME_PATH}.")
+        except ImportError:
+            logger.warning(f"reportlab not installed. Please manually create a dummy PDF at {DEFAULT_RESUME_PATH} if you don't upload a resume via Tally.")
+        except Exception as e:
+            logger.error(f"Failed to create default resume PDF: {e}")
+
+_app_initialized = False
+_app_init_lock = threading.Lock()
+
+def create_app():
+    """
+    App factory: runs one-time startup work and returns the Flask app.
+    Importing this module has no side effects; call this once per process instead,
+    e.g. `gunicorn 'main:create_app()'`. Safe to call more than once.
+    """
+    global _app_initialized
+    with _app_init_lock:
+        if not _app_initialized:
+            load_initial_config()
+            ensure_default_resume()
+            import_local_applied_urls()
+            ensure_queue_worker() # Pick up any queued work left over from before a restart
+            resume_interrupted_cycle()
+            _app_initialized = True
+    return app
 
 # --- Helper Functions ---
 
@@ -75,11 +162,21 @@ def location_allowed(text):
     # For now, return True to allow all locations
     return True
 
+def distributed_mode():
+    """Whether config['distributed'] is on, i.e. state lives in the shared queue database."""
+    return bool(get_current_config().get("distributed"))
+
 def load_applied_urls():
+    """Loads URLs of previously applied jobs from CSV_PATH, or the shared set in distributed mode."""
+    if distributed_mode():
+        return load_shared_applied_urls()
+    return load_csv_applied_urls()
+
+def load_csv_applied_urls():
     """Loads URLs of previously applied jobs from CSV_PATH."""
     if not os.path.exists(CSV_PATH):
         with open(CSV_PATH, "w", newline="") as f:
-            csv.writer(f).writerow(["timestamp", "title", "company", "url"])
+            csv.writer(f).writerow(APPLIED_JOBS_FIELDS)
         logger.info(f"Created new CSV file: {CSV_PATH}")
         return set()
     try:
@@ -92,7 +189,7 @@ def load_applied_urls():
         return set()
 
 def log_application(job):
-    """Logs a successful job application to the CSV_PATH file."""
+    """Logs a successful job application to the CSV_PATH file (the shared database in distributed mode)."""
     logger.debug("log_application() was called")
 
     runtime_config = get_current_config() # Always get the latest config
@@ -102,6 +199,15 @@ def log_application(job):
 
     ts = datetime.utcnow().isoformat()
 
+    if runtime_config.get("distributed"):
+        # Every node's applications go to one log, so the history views see all of them
+        try:
+            log_shared_application(ts, job)
+            logger.info(f"[DB ✅] Logged application: {job.get('title', 'N/A')} at {job.get('company', 'N/A')}")
+        except sqlite3.Error as e:
+            logger.error(f"[DB ERROR] Failed to log application to shared log: {e}")
+        return
+
     try:
         with open(CSV_PATH, mode="a", newline="") as file:
             writer = csv.writer(file)
@@ -128,10 +234,236 @@ def log_application(job):
     except Exception as e:
         logger.error(f"[CSV CLEANUP ERROR] Failed to clean up CSV: {e}")
 
+def iter_applied_jobs(offset=0, query=""):
+    """
+    Yields (row_dict, next_offset) from CSV_PATH one row at a time, starting at a byte offset.
+    next_offset is the file position right after the row and can be passed back in as a
+    cursor to resume from there. Rows are filtered by a case-insensitive substring `query`.
+    In distributed mode rows come from the shared log and the cursor is a row id instead.
+    """
+    if distributed_mode():
+        yield from iter_shared_applications(offset, query)
+        return
+    if not os.path.exists(CSV_PATH):
+        return
+    query = query.lower().strip()
+    with open(CSV_PATH, newline="") as f:
+        header = next(csv.reader([f.readline()]), None)
+        if not header:
+            return
+        start = f.tell()
+        # Cursors from before a trim can point past the end or into the header; restart then
+        if offset > start and offset <= os.fstat(f.fileno()).st_size:
+            f.seek(offset)
+        # Feed csv.reader via readline() so f.tell() stays usable between rows
+        reader = csv.reader(iter(f.readline, ""))
+        for row in reader:
+            if len(row) < len(header):
+                continue
+            if query and query not in " ".join(row).lower():
+                continue
+            yield dict(zip(header, row)), f.tell()
+
+# --- Cycle Profiling ---
+
+class _CycleProfile:
+    """Stage tags per thread, stage timings and (pstats mode) per-thread profilers of one profiled cycle."""
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.stage_tags = {}
+        self.stage_totals = {}
+        self.thread_profiles = []
+        self.single_profiler = False
+        self.lock = threading.Lock()
+
+# Set only inside run_profiled_cycle() (and copied into its enrichment workers), so cycles
+# running alongside it, e.g. from Tally or another /run_bot, are never tagged or profiled
+_active_profile = contextvars.ContextVar("active_profile", default=None)
+_profiling_running = False
+_profiling_lock = threading.Lock()
+
+@contextlib.contextmanager
+def profile_stage(stage, source=None):
+    """
+    Tags the enclosed work with a stage (and optional source) for the cycle profiler.
+    A no-op outside a profiled cycle, so normal cycles don't pay for it.
+    """
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+        return
+    tag = f"{stage}:{source}" if source else stage
+    tags = profile.stage_tags.setdefault(threading.get_ident(), [])
+    # In pstats mode the outermost stage on each thread (the cycle thread and every
+    # enrichment worker) gets its own cProfile, merged into one file when the cycle ends
+    profiler = None
+    if not tags and profile.mode == "pstats" and not profile.single_profiler:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process; fall back to the cycle thread's,
+            # which on those versions records every thread (including any other cycle running now)
+            logger.warning("[PROFILE] Only one cProfile can run at a time on this Python; the cycle thread's profiler covers all threads.")
+            profile.single_profiler = True
+            profiler = None
+    tags.append(tag)
+    path = "/".join(tags)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        tags.pop()
+        if not tags:
+            profile.stage_tags.pop(threading.get_ident(), None)
+        with profile.lock:
+            if profiler:
+                profiler.disable()
+                profile.thread_profiles.append(profiler)
+            total = profile.stage_totals.setdefault(path, {"seconds": 0.0, "calls": 0})
+            total["seconds"] += elapsed
+            total["calls"] += 1
+
+def _format_frame(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _sample_stacks(profile, stop, counts):
+    """Sampling loop: records the stack of every stage-tagged thread as a collapsed-stack line."""
+    while not stop.wait(PROFILE_SAMPLE_INTERVAL):
+        frames = sys._current_frames()
+        for ident, tags in list(profile.stage_tags.items()):
+            frame = frames.get(ident)
+            if frame is None or not tags:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_format_frame(frame))
+                frame = frame.f_back
+            key = ";".join(list(tags) + stack[::-1])
+            counts[key] = counts.get(key, 0) + 1
+
+def run_profiled_cycle(mode="sample"):
+    """
+    Runs one bot_cycle() under the profiler and writes the artifacts to PROFILE_DIR:
+    <id>.stages.json (wall time per stage/source) plus either <id>.collapsed
+    (sampled flame graph input, mode "sample") or <id>.pstats (cProfile, mode "pstats").
+    """
+    global _profiling_running
+    import pstats
+
+    with _profiling_lock:
+        already_running = _profiling_running
+        _profiling_running = True
+    if already_running:
+        logger.warning("[PROFILE] A profiled cycle is already running; running this one unprofiled.")
+        bot_cycle()
+        return None
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile_id = f"cycle-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    logger.info(f"[PROFILE] Starting profiled cycle {profile_id} ({mode}).")
+
+    profile = _CycleProfile(mode)
+    token = _active_profile.set(profile)
+    counts, stop, sampler = {}, threading.Event(), None
+    if mode != "pstats":
+        sampler = threading.Thread(target=_sample_stacks, args=(profile, stop, counts), daemon=True)
+        sampler.start()
+    try:
+        with profile_stage("cycle"):
+            bot_cycle()
+    finally:
+        _active_profile.reset(token)
+        if mode == "pstats":
+            with profile.lock:
+                profiles = list(profile.thread_profiles)
+            if profiles:
+                pstats.Stats(*profiles).dump_stats(os.path.join(PROFILE_DIR, f"{profile_id}.pstats"))
+        else:
+            stop.set()
+            sampler.join()
+            with open(os.path.join(PROFILE_DIR, f"{profile_id}.collapsed"), "w") as f:
+                for stack, count in sorted(counts.items()):
+                    f.write(f"{stack} {count}\n")
+        with profile.lock:
+            stages = dict(sorted(profile.stage_totals.items(), key=lambda item: item[1]["seconds"], reverse=True))
+        with open(os.path.join(PROFILE_DIR, f"{profile_id}.stages.json"), "w") as f:
+            json.dump(stages, f, indent=2)
+        with _profiling_lock:
+            _profiling_running = False
+        logger.info(f"[PROFILE] Wrote profile {profile_id} to {PROFILE_DIR}/.")
+    return profile_id
+
 # --- Core Request/BeautifulSoup Helper ---
 
-def _make_request(url, headers=None, timeout=15):
-    """Helper to make robust HTTP requests with default User-Agent header."""
+class _ByteBudget:
+    """
+    Caps the total bytes of page bodies held in memory at once across all scraping threads.
+    Each page reserves its bytes once, before reading, and never asks for more while holding
+    a reservation, so waiters can always be satisfied by pages that are already reading.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, n, timeout=None):
+        """Reserves n bytes (at most the whole budget). Returns the amount reserved, or None on timeout."""
+        n = min(n, self.limit)
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.used + n <= self.limit, timeout=timeout):
+                return None
+            self.used += n
+            return n
+
+    def release(self, n):
+        with self._cond:
+            self.used -= n
+            self._cond.notify_all()
+
+_inflight_page_bytes = _ByteBudget(SCRAPE_INFLIGHT_BYTES_BUDGET)
+
+def _memory_bounded_scrape():
+    """Whether config['memory_bounded_scrape'] is on."""
+    return bool(get_current_config().get("memory_bounded_scrape"))
+
+def _card_strainer(names, classes):
+    """SoupStrainer that only builds elements named `names` carrying any of `classes`."""
+    from bs4 import SoupStrainer
+
+    wanted = set(classes)
+    # While parsing, class is still the raw attribute string ("job-card featured"), so split it
+    return SoupStrainer(names, class_=lambda value: bool(value) and not wanted.isdisjoint(value.split()))
+
+def _release_as_consumed(elements, soup):
+    """
+    Iterates parse-tree elements; in memory-bounded mode each one is decomposed once the
+    caller moves on, and the whole tree when iteration ends, instead of waiting for the GC
+    to collect the tree's reference cycles.
+    """
+    if not _memory_bounded_scrape():
+        yield from elements
+        return
+    try:
+        for element in elements:
+            if element.decomposed: # Nested inside an element we already released
+                continue
+            yield element
+            element.decompose()
+    finally:
+        soup.decompose()
+
+def _make_request(url, headers=None, timeout=15, cards=None):
+    """
+    Helper to make robust HTTP requests with default User-Agent header.
+    cards=(names, classes) describes the job card elements; in memory-bounded mode the body
+    is streamed under a byte cap and only those elements are built into the parse tree.
+    """
     if headers is None:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -140,17 +472,73 @@ def _make_request(url, headers=None, timeout=15):
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
             'Connection': 'keep-alive',
         }
+    # Imported here so processes that never scrape (e.g. web workers) don't pay for them at startup
+    import requests
+    from bs4 import BeautifulSoup
+
+    if _memory_bounded_scrape():
+        return _make_bounded_request(url, headers, timeout, cards)
+
     try:
-        session = requests.Session()
-        response = session.get(url, headers=headers, timeout=timeout)
-        response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
-        return BeautifulSoup(response.content, 'html.parser')
+        with profile_stage("fetch"):
+            session = requests.Session()
+            response = session.get(url, headers=headers, timeout=timeout)
+            response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
+        with profile_stage("parse"):
+            return BeautifulSoup(response.content, 'html.parser')
     except requests.exceptions.RequestException as e:
         logger.error(f"Request failed for {url}: {e}")
         return None
 
+def _make_bounded_request(url, headers, timeout, cards):
+    """Memory-bounded variant of _make_request: streamed, size-capped body and a card-only parse tree."""
+    import requests
+    from bs4 import BeautifulSoup
+
+    reserved = 0
+    try:
+        try:
+            with profile_stage("fetch"):
+                with requests.Session().get(url, headers=headers, timeout=timeout, stream=True) as response:
+                    response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
+                    # Reserve the whole page up front. Content-Length of an encoded body says nothing
+                    # about the decoded size, so only trust it for identity-encoded responses.
+                    declared = response.headers.get("Content-Length")
+                    if declared and declared.isdigit() and not response.headers.get("Content-Encoding"):
+                        page_cap = min(int(declared), SCRAPE_MAX_PAGE_BYTES)
+                    else:
+                        page_cap = SCRAPE_MAX_PAGE_BYTES
+                    reserved = _inflight_page_bytes.acquire(page_cap, timeout=timeout)
+                    if reserved is None:
+                        logger.warning(f"[SCRAPE] Timed out waiting for page memory budget for {url}.")
+                        return None
+
+                    chunks, size = [], 0
+                    for chunk in response.iter_content(chunk_size=SCRAPE_CHUNK_SIZE):
+                        if size + len(chunk) > reserved:
+                            chunks.append(chunk[:reserved - size])
+                            logger.warning(f"[SCRAPE] {url} exceeded {reserved} bytes; parsing the first part only.")
+                            break
+                        size += len(chunk)
+                        chunks.append(chunk)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request failed for {url}: {e}")
+            return None
+
+        with profile_stage("parse"):
+            body = b"".join(chunks)
+            chunks.clear()
+            parse_only = _card_strainer(*cards) if cards else None
+            return BeautifulSoup(body, 'html.parser', parse_only=parse_only)
+    finally:
+        if reserved:
+            _inflight_page_bytes.release(reserved)
+
 # --- New Requests + BeautifulSoup Scrapers ---
 
+# Each scraper returns its list of jobs, or None when the request failed, so callers can tell
+# an outage from a genuinely empty result page
+
 def scrape_jobicy(keyword, location):
     """Scrape Jobicy for remote jobs using requests + BeautifulSoup."""
     jobs = []
@@ -165,14 +553,14 @@ def scrape_jobicy(keyword, location):
     
     logger.info(f"[SCRAPE] Scraping Jobicy for '{keyword}' in '{location}'...")
     
-    soup = _make_request(url)
+    soup = _make_request(url, cards=("div", ["job-card"]))
     if not soup:
-        logger.warning(f"[SCRAPE] Jobicy returned 0 jobs (request failed or page not found).")
-        return jobs
+        logger.warning(f"[SCRAPE] Jobicy request failed; no jobs this run.")
+        return None
 
     job_cards = soup.find_all('div', class_='job-card') # This selector might need adjustment
     
-    for card in job_cards:
+    for card in _release_as_consumed(job_cards, soup):
         try:
             title_elem = card.find('h2', class_='job-card__title')
             title = title_elem.text.strip() if title_elem else 'N/A'
@@ -217,16 +605,16 @@ def scrape_jooble(keyword, location):
     # Jooble often requires pagination to get more results. Let's try first page.
     # To implement more pages, you'd loop through `pn` parameter.
     
-    soup = _make_request(url)
+    soup = _make_request(url, cards=("article", ["job-card"]))
     if not soup:
-        logger.warning(f"[SCRAPE] Jooble returned 0 jobs (request failed or page not found).")
-        return jobs
+        logger.warning(f"[SCRAPE] Jooble request failed; no jobs this run.")
+        return None
 
     # Inspect Jooble's HTML for job listing containers
     # Common selectors for job cards on job boards: 'div.job-item', 'article.job-card', 'li.job-listing'
     job_cards = soup.find_all('article', class_='job-card') # This selector might need adjustment
     
-    for card in job_cards:
+    for card in _release_as_consumed(job_cards, soup):
         try:
             title_elem = card.find('a', class_='job-card__title-link') # Adjusted based on typical structure
             title = title_elem.text.strip() if title_elem else 'N/A'
@@ -270,10 +658,10 @@ def scrape_careerpage(keyword, location):
     
     logger.info(f"[SCRAPE] Scraping Careerpage.co for '{keyword}' in '{location}'...")
     
-    soup = _make_request(url)
+    soup = _make_request(url, cards=(["div", "a"], ["job-listing-card", "job-link"]))
     if not soup:
-        logger.warning(f"[SCRAPE] Careerpage.co returned 0 jobs (request failed or page not found).")
-        return jobs
+        logger.warning(f"[SCRAPE] Careerpage.co request failed; no jobs this run.")
+        return None
 
     # Inspect Careerpage.co HTML for job listing containers. This is highly variable.
     job_cards = soup.find_all('div', class_='job-listing-card') # This selector is a guess and will likely need adjustment
@@ -282,7 +670,7 @@ def scrape_careerpage(keyword, location):
         # Fallback to more generic search if specific card class not found
         job_cards = soup.find_all('a', class_='job-link') # Another common pattern
         
-    for card in job_cards:
+    for card in _release_as_consumed(job_cards, soup):
         try:
             # Assuming the card itself or an anchor within it holds the main info
             title_elem = card.find('h3', class_='job-title') or card.find('h2') or card.find('span', class_='title')
@@ -332,15 +720,15 @@ def scrape_workable(keyword, location):
     
     logger.info(f"[SCRAPE] Scraping Workable.com for '{keyword}' in '{location}'...")
     
-    soup = _make_request(url)
+    soup = _make_request(url, cards=("li", ["job-card"]))
     if not soup:
-        logger.warning(f"[SCRAPE] Workable returned 0 jobs (request failed or page not found).")
-        return jobs
+        logger.warning(f"[SCRAPE] Workable request failed; no jobs this run.")
+        return None
 
     # Inspect Workable's HTML for job listing containers. This is also highly variable.
     job_cards = soup.find_all('li', class_='job-card') # This selector is a guess
     
-    for card in job_cards:
+    for card in _release_as_consumed(job_cards, soup):
         try:
             title_elem = card.find('h2', class_='job-title') or card.find('a', class_='job-link-title')
             title = title_elem.text.strip() if title_elem else 'N/A'
@@ -384,15 +772,15 @@ def scrape_lensa(keyword, location):
     
     logger.info(f"[SCRAPE] Scraping Lensa.com for '{keyword}' in '{location}'...")
     
-    soup = _make_request(url)
+    soup = _make_request(url, cards=("div", ["job-listing-card"]))
     if not soup:
-        logger.warning(f"[SCRAPE] Lensa returned 0 jobs (request failed or page not found).")
-        return jobs
+        logger.warning(f"[SCRAPE] Lensa request failed; no jobs this run.")
+        return None
 
     # Inspect Lensa's HTML for job listing containers.
     job_cards = soup.find_all('div', class_='job-listing-card') # This selector is a guess and will likely need adjustment
     
-    for card in job_cards:
+    for card in _release_as_consumed(job_cards, soup):
         try:
             title_elem = card.find('h2', class_='job-title') or card.find('a', class_='job-title-link')
             title = title_elem.text.strip() if title_elem else 'N/A'
@@ -431,12 +819,12 @@ def scrape_remoteok():
     url = "https://remoteok.io/remote-dev-jobs"
     jobs = []
     
-    soup = _make_request(url)
+    soup = _make_request(url, cards=("tr", ["job"]))
     if not soup:
-        logger.warning(f"[SCRAPE] RemoteOK returned 0 jobs (request failed).")
-        return jobs
+        logger.warning(f"[SCRAPE] RemoteOK request failed; no jobs this run.")
+        return None
 
-    for row in soup.select("tr.job")[:max_results]:
+    for row in _release_as_consumed(soup.select("tr.job")[:max_results], soup):
         try:
             l = row.select_one("a.preventLink")
             if not l: continue
@@ -461,12 +849,12 @@ def scrape_flexjobs():
     url = "https://www.flexjobs.com/remote-jobs/developer"
     jobs = []
     
-    soup = _make_request(url)
+    soup = _make_request(url, cards=("div", ["job"]))
     if not soup:
-        logger.warning(f"[SCRAPE] FlexJobs returned 0 jobs (request failed).")
-        return jobs
+        logger.warning(f"[SCRAPE] FlexJobs request failed; no jobs this run.")
+        return None
 
-    for item in soup.select("div.job")[:max_results]:
+    for item in _release_as_consumed(soup.select("div.job")[:max_results], soup):
         try:
             a = item.select_one("a")
             if not a: continue
@@ -491,13 +879,13 @@ def scrape_wellfound(keywords):
     query = '+'.join(keywords)
     url = f"https://wellfound.com/jobs?q={urllib.parse.quote(query)}&location=Remote"
     
-    soup = _make_request(url)
+    soup = _make_request(url, cards=("div", ["job-listing"]))
     if not soup:
-        logger.warning(f"[SCRAPE] Wellfound returned 0 jobs (request failed).")
-        return jobs
+        logger.warning(f"[SCRAPE] Wellfound request failed; no jobs this run.")
+        return None
 
     job_listings = soup.find_all('div', class_='job-listing') # Adjust selector
-    for listing in job_listings:
+    for listing in _release_as_consumed(job_listings, soup):
         try:
             title_elem = listing.find('h2', class_='job-title') # Adjust selector
             title = title_elem.text.strip() if title_elem else 'N/A'
@@ -528,13 +916,13 @@ def scrape_powertofly(keywords):
     query = '+'.join(keywords)
     url = f"https://powertofly.com/jobs?query={urllib.parse.quote(query)}&is_remote=true"
     
-    soup = _make_request(url)
+    soup = _make_request(url, cards=("div", ["job-card"]))
     if not soup:
-        logger.warning(f"[SCRAPE] PowerToFly returned 0 jobs (request failed).")
-        return jobs
+        logger.warning(f"[SCRAPE] PowerToFly request failed; no jobs this run.")
+        return None
 
     job_cards = soup.find_all('div', class_='job-card') # Adjust selector
-    for card in job_cards:
+    for card in _release_as_consumed(job_cards, soup):
         try:
             title_elem = card.find('h3', class_='job-card-title') # Adjust selector
             title = title_elem.text.strip() if title_elem else 'N/A'
@@ -560,52 +948,490 @@ def scrape_powertofly(keywords):
     return jobs
 
 
-def get_jobs():
-    """Aggregates jobs from all defined scrapers."""
+# --- Search Query Planning ---
+
+# What each source can do with a query:
+#   "single" - one keyword per request (the site ANDs every word, so joined keywords match almost nothing)
+#   "or"     - free-text search; up to OR_GROUP_SIZE keywords grouped into one "a OR b OR c" request
+#   "none"   - fixed listing page, filtered locally by keyword; one request per cycle
+# "budget" is the default max requests per cycle; override per source with config["query_budget"].
+# "host" is what distributed scrape tasks are sharded on for per-host politeness.
+SOURCE_CAPABILITIES = {
+    "jobicy": {"call": lambda q, loc: scrape_jobicy(q, loc), "style": "single", "budget": 3, "host": "jobicy.com"},
+    "jooble": {"call": lambda q, loc: scrape_jooble(q, loc), "style": "single", "budget": 3, "host": "us.jooble.org"},
+    "careerpage": {"call": lambda q, loc: scrape_careerpage(q, loc), "style": "single", "budget": 2, "host": "www.careerpage.co"},
+    "workable": {"call": lambda q, loc: scrape_workable(q, loc), "style": "single", "budget": 3, "host": "www.workable.com"},
+    "lensa": {"call": lambda q, loc: scrape_lensa(q, loc), "style": "single", "budget": 3, "host": "lensa.com"},
+    "remoteok": {"call": lambda q, loc: scrape_remoteok(), "style": "none", "budget": 1, "host": "remoteok.io"},
+    "flexjobs": {"call": lambda q, loc: scrape_flexjobs(), "style": "none", "budget": 1, "host": "www.flexjobs.com"},
+    "wellfound": {"call": lambda q, loc: scrape_wellfound([q]), "style": "or", "budget": 2, "host": "wellfound.com"},
+    "powertofly": {"call": lambda q, loc: scrape_powertofly([q]), "style": "or", "budget": 2, "host": "powertofly.com"},
+}
+
+def _normalize_query(query):
+    return " ".join(query.lower().split())
+
+def _query_stats_key(source, query, location):
+    return f"{source}|{query}|{location.lower()}"
+
+def load_query_stats():
+    """Loads per-query yield stats from earlier cycles."""
+    try:
+        with open(QUERY_STATS_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_query_stats(stats):
+    """Writes per-query yield stats atomically."""
+    tmp_path = f"{QUERY_STATS_PATH}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(stats, f, indent=2)
+        os.replace(tmp_path, QUERY_STATS_PATH)
+    except OSError as e:
+        logger.error(f"[PLAN] Failed to save query stats: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def record_query_yield(stats, source, query, location, new_jobs):
+    """Updates the running stats for one executed query."""
+    entry = stats.setdefault(_query_stats_key(source, query, location),
+                             {"runs": 0, "new_jobs": 0, "empty_streak": 0, "last_run": 0})
+    entry["runs"] += 1
+    entry["new_jobs"] += new_jobs
+    entry["empty_streak"] = 0 if new_jobs else entry["empty_streak"] + 1
+    entry["last_run"] = time.time()
+
+def _is_pruned(entry):
+    """A query is pruned after repeated empty runs, but re-probed once QUERY_REPROBE_HOURS have passed."""
+    if not entry or entry["empty_streak"] < QUERY_PRUNE_AFTER_EMPTY_RUNS:
+        return False
+    return time.time() - entry["last_run"] < QUERY_REPROBE_HOURS * 3600
+
+def _expected_yield(entry):
+    """Average new jobs per run; untried queries sort first so they get explored."""
+    if not entry or not entry["runs"]:
+        return float("inf")
+    return entry["new_jobs"] / entry["runs"]
+
+def plan_queries(keyword_sets, location, stats, budgets=None):
+    """
+    Fans keywords x location out into per-source requests.
+    keyword_sets is a list of keyword lists (one per profile); identical queries across
+    profiles collapse into one request. Returns a list of (source, query, location) tuples,
+    ordered best-yielding first and capped at each source's budget.
+    """
+    budgets = budgets or {}
+    keywords = []
+    for keyword_set in keyword_sets:
+        for kw in keyword_set:
+            kw = _normalize_query(kw)
+            if kw and kw not in keywords:
+                keywords.append(kw)
+
+    plan = []
+    for source, caps in SOURCE_CAPABILITIES.items():
+        style = caps["style"]
+        if style == "none":
+            candidates = [""]
+        elif style == "or":
+            candidates = [" OR ".join(keywords[i:i + OR_GROUP_SIZE]) for i in range(0, len(keywords), OR_GROUP_SIZE)]
+        else:
+            candidates = list(keywords)
+
+        seen = set()
+        ranked = []
+        for query in candidates:
+            if query in seen:
+                continue
+            seen.add(query)
+            entry = stats.get(_query_stats_key(source, query, location))
+            if _is_pruned(entry):
+                logger.debug(f"[PLAN] Pruned {source} query '{query}' after {entry['empty_streak']} empty runs.")
+                continue
+            ranked.append((query, _expected_yield(entry)))
+        # Stable sort keeps config keyword order among equally-yielding queries
+        ranked.sort(key=lambda item: item[1], reverse=True)
+
+        budget = budgets.get(source, caps["budget"])
+        plan.extend((source, query, location) for query, _ in ranked[:budget])
+
+    logger.info(f"[PLAN] Planned {len(plan)} requests across {len(SOURCE_CAPABILITIES)} sources.")
+    return plan
+
+def get_jobs(known_urls=None, checkpoint=None):
+    """
+    Aggregates jobs from all sources by running the query plan.
+    known_urls (e.g. already-applied URLs) don't count as new when scoring query yield.
+    With a checkpoint, progress is saved after every request and a resumed cycle
+    reuses its plan and skips the requests it already made.
+    """
     config = get_current_config()
     keywords_from_config = [kw.lower().strip() for kw in config.get("keywords", []) if kw.strip()]
     max_results = config.get("max_results", 50)
-    
-    all_jobs = []
-    
+    known_urls = known_urls or set()
+
     # Define location for location-specific scrapers (can be made dynamic from Tally form)
-    location_param = config.get("user_data", {}).get("location", "United States") 
-
-    scrapers = [
-        # New requests+BeautifulSoup scrapers
-        lambda: scrape_jobicy(" ".join(keywords_from_config), location_param),
-        lambda: scrape_jooble(" ".join(keywords_from_config), location_param),
-        lambda: scrape_careerpage(" ".join(keywords_from_config), location_param),
-        lambda: scrape_workable(" ".join(keywords_from_config), location_param),
-        lambda: scrape_lensa(" ".join(keywords_from_config), location_param),
-
-        # Existing requests-based scrapers (kept if not explicitly asked to remove)
-        lambda: scrape_remoteok(), 
-        lambda: scrape_flexjobs(),
-        lambda: scrape_wellfound(keywords_from_config), 
-        lambda: scrape_powertofly(keywords_from_config)
-    ]
-    
-    for fn in scrapers:
+    location_param = config.get("user_data", {}).get("location", "United States")
+
+    stats = load_query_stats()
+    if checkpoint and checkpoint.get("plan") is not None:
+        plan = [tuple(entry) for entry in checkpoint["plan"]]
+    else:
+        plan = plan_queries([keywords_from_config], location_param, stats, config.get("query_budget"))
+        if checkpoint is not None:
+            checkpoint["plan"] = plan
+            save_cycle_checkpoint(checkpoint)
+
+    # Remove duplicates as we go, so yield stats only credit a query for jobs nobody else found first
+    unique = list(checkpoint["jobs"]) if checkpoint else []
+    seen = {j["url"] for j in unique}
+    completed = set(checkpoint["completed"]) if checkpoint else set()
+    if completed:
+        logger.info(f"[CHECKPOINT] Skipping {len(completed)}/{len(plan)} requests already made this cycle.")
+    for index, (source, query, location) in enumerate(plan):
+        if index in completed:
+            continue
         try:
-            jobs = fn()
-            all_jobs.extend(jobs)
+            with profile_stage("scrape", source):
+                jobs = SOURCE_CAPABILITIES[source]["call"](query, location)
         except Exception as e:
-            logger.error(f"[SCRAPE ERROR] {fn.__name__}: {e}")
-        time.sleep(2)  # Delay between scrapers to be polite and avoid hammering sites
+            logger.error(f"[SCRAPE ERROR] {source} '{query}': {e}")
+            jobs = None
 
-    # Remove duplicates
-    seen, unique = set(), []
-    for j in all_jobs:
-        if j["url"] not in seen:
+        new_jobs = 0
+        for j in jobs or []:
+            if j["url"] in seen:
+                continue
             seen.add(j["url"])
             unique.append(j)
-        if len(unique) >= max_results:
-            break
-
+            if j["url"] not in known_urls:
+                new_jobs += 1
+        if jobs is None:
+            # An outage says nothing about the query, so only real zero-result runs move it toward pruning
+            logger.warning(f"[PLAN] {source} '{query}' failed; yield stats left unchanged.")
+        else:
+            record_query_yield(stats, source, query, location, new_jobs)
+            logger.info(f"[PLAN] {source} '{query}' yielded {new_jobs} new jobs.")
+        if checkpoint is not None:
+            checkpoint["completed"].append(index)
+            checkpoint["jobs"] = unique
+            save_cycle_checkpoint(checkpoint)
+        with profile_stage("sleep"):
+            time.sleep(2)  # Delay between requests to be polite and avoid hammering sites
+
+    save_query_stats(stats)
+
+    unique = unique[:max_results]
     logger.info(f"[SCRAPE] Found {len(unique)} unique jobs across all sources.")
     return unique
 
+# --- Job Detail Enrichment ---
+
+# Query parameters that only track the click and never change the page content
+TRACKING_PARAMS = {"ref", "source", "src", "fbclid", "gclid", "trk", "refid", "trackingid"}
+
+# In-process registry so concurrent lookups of the same page share one fetch
+_detail_inflight = {}
+_detail_inflight_lock = threading.Lock()
+
+# Per-host lock and last-request time, so enrichment workers only run in parallel across hosts
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+@contextlib.contextmanager
+def _polite_host_slot(url):
+    """Serializes requests to one host and spaces them at least SCRAPE_HOST_DELAY_SECONDS apart."""
+    host = urllib.parse.urlsplit(url).netloc.lower()
+    with _host_slots_lock:
+        slot = _host_slots.setdefault(host, {"lock": threading.Lock(), "last": 0.0})
+    with slot["lock"]:
+        wait = slot["last"] + SCRAPE_HOST_DELAY_SECONDS - time.monotonic()
+        if wait > 0:
+            with profile_stage("sleep"):
+                time.sleep(wait)
+        try:
+            yield
+        finally:
+            slot["last"] = time.monotonic()
+
+def canonicalize_url(url):
+    """Normalize a job URL so the same posting seen on different cycles/boards maps to one key."""
+    parts = urllib.parse.urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/") or "/"
+    query = [
+        (k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ]
+    query.sort()
+    return urllib.parse.urlunsplit(("https", host, path, urllib.parse.urlencode(query), ""))
+
+def _detail_cache_path(canonical_url):
+    """Cache file for a canonical URL, sharded by the first two hex digits of its hash."""
+    key = hashlib.sha256(canonical_url.encode("utf-8")).hexdigest()
+    return os.path.join(DETAIL_CACHE_DIR, key[:2], f"{key}.json")
+
+def load_cached_details(canonical_url, ttl_hours):
+    """
+    Returns cached details for a URL, {} if its last fetch failed less than DETAIL_FAILURE_TTL_HOURS ago,
+    or None if missing, unreadable or older than the TTL.
+    """
+    path = _detail_cache_path(canonical_url)
+    try:
+        with open(path) as f:
+            entry = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if entry.get("failed"):
+        ttl_hours = min(ttl_hours, DETAIL_FAILURE_TTL_HOURS)
+    if time.time() - entry.get("fetched_at", 0) > ttl_hours * 3600:
+        return None
+    return entry.get("details") or {}
+
+def save_cached_details(canonical_url, details):
+    """
+    Writes details for a URL to the cache atomically (write to temp file, then rename).
+    details=None records a failed fetch, so repeat sightings don't refetch it until it expires.
+    """
+    path = _detail_cache_path(canonical_url)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump({"url": canonical_url, "fetched_at": time.time(), "details": details,
+                       "failed": details is None}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.error(f"[ENRICH] Failed to write detail cache for {canonical_url}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _format_salary(base_salary):
+    """Flattens a schema.org baseSalary object into a readable string."""
+    if not isinstance(base_salary, dict):
+        return str(base_salary) if base_salary else ""
+    currency = base_salary.get("currency", "")
+    value = base_salary.get("value", {})
+    if isinstance(value, dict):
+        low, high = value.get("minValue"), value.get("maxValue")
+        amount = f"{low}-{high}" if low and high else str(value.get("value") or low or high or "")
+        unit = value.get("unitText", "")
+    else:
+        amount, unit = str(value), ""
+    return " ".join(part for part in (currency, amount, unit) if part).strip()
+
+def _find_job_posting_ld(soup):
+    """Returns the first schema.org JobPosting object embedded as JSON-LD, if any."""
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except (json.JSONDecodeError, TypeError):
+            continue
+        candidates = data if isinstance(data, list) else data.get("@graph", [data])
+        for item in candidates:
+            if isinstance(item, dict) and item.get("@type") == "JobPosting":
+                return item
+    return None
+
+def extract_job_details(soup, url):
+    """Pulls description, salary, posted date and apply URL out of a job detail page."""
+    from bs4 import BeautifulSoup
+
+    details = {"description": "", "salary": "", "posted_date": "", "apply_url": ""}
+
+    # Most boards embed structured JobPosting data for search engines; prefer it when present
+    posting = _find_job_posting_ld(soup)
+    if posting:
+        description = posting.get("description", "")
+        details["description"] = BeautifulSoup(description, "html.parser").get_text(" ", strip=True) if description else ""
+        details["salary"] = _format_salary(posting.get("baseSalary"))
+        details["posted_date"] = posting.get("datePosted", "")
+        details["apply_url"] = posting.get("url", "")
+
+    # Fall back to common page structures for anything the JSON-LD didn't cover
+    if not details["description"]:
+        desc_elem = (soup.find("div", class_="job-description") or soup.find("section", class_="job-description")
+                     or soup.find("div", id="job-description") or soup.find("article"))
+        if desc_elem:
+            details["description"] = desc_elem.get_text(" ", strip=True)
+        else:
+            meta = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", property="og:description")
+            details["description"] = meta.get("content", "").strip() if meta else ""
+
+    if not details["salary"]:
+        salary_elem = soup.find(class_="salary") or soup.find(class_="job-salary")
+        details["salary"] = salary_elem.get_text(" ", strip=True) if salary_elem else ""
+
+    if not details["posted_date"]:
+        time_elem = soup.find("time", datetime=True)
+        details["posted_date"] = time_elem["datetime"] if time_elem else ""
+
+    if not details["apply_url"]:
+        apply_elem = soup.find("a", class_="apply-button", href=True) or soup.find(
+            "a", href=True, string=lambda s: s and "apply" in s.lower())
+        details["apply_url"] = urllib.parse.urljoin(url, apply_elem["href"]) if apply_elem else url
+
+    return details
+
+def fetch_job_details(url, ttl_hours):
+    """Returns details for a job URL from the cache, fetching the detail page at most once per TTL."""
+    canonical = canonicalize_url(url)
+    cached = load_cached_details(canonical, ttl_hours)
+    if cached is not None:
+        logger.debug(f"[ENRICH] Cache hit for {canonical}")
+        return cached
+
+    # If another worker is already fetching this page, wait for its result instead of refetching
+    with _detail_inflight_lock:
+        event = _detail_inflight.get(canonical)
+        owner = event is None
+        if owner:
+            event = _detail_inflight[canonical] = threading.Event()
+    if not owner:
+        event.wait()
+        return load_cached_details(canonical, ttl_hours)
+
+    try:
+        with _polite_host_slot(url):
+            soup = _make_request(url)
+        if not soup:
+            save_cached_details(canonical, None)
+            return None
+        try:
+            details = extract_job_details(soup, url)
+        except Exception as e:
+            logger.warning(f"[ENRICH] Error parsing detail page {url}: {e}")
+            save_cached_details(canonical, None)
+            return None
+        save_cached_details(canonical, details)
+        logger.info(f"[ENRICH] Fetched details for {canonical}")
+        return details
+    finally:
+        with _detail_inflight_lock:
+            _detail_inflight.pop(canonical, None)
+        event.set()
+
+def _fetch_job_details_tagged(url, ttl_hours):
+    # Runs on pool threads in a copy of the cycle thread's context, so a profiled cycle's workers are tagged too.
+    # One bad URL (malformed, cache write error, ...) must not abort the whole cycle via pool results.
+    try:
+        with profile_stage("enrich", urllib.parse.urlsplit(url).netloc):
+            return fetch_job_details(url, ttl_hours)
+    except Exception as e:
+        logger.warning(f"[ENRICH] Failed to fetch details for {url}: {e}")
+        return None
+
+def enrich_jobs(jobs):
+    """Fetches detail pages concurrently and merges description, salary, posted date and apply URL into each job."""
+    config = get_current_config()
+    ttl_hours = config.get("detail_cache_ttl_hours", DEFAULT_DETAIL_CACHE_TTL_HOURS)
+    workers = max(1, config.get("enrich_workers", DEFAULT_ENRICH_WORKERS))
+
+    fetchable = [j for j in jobs if j.get("url", "N/A").startswith("http")]
+    if not fetchable:
+        return jobs
+
+    logger.info(f"[ENRICH] Enriching {len(fetchable)} jobs with {workers} workers...")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, _fetch_job_details_tagged, j["url"], ttl_hours)
+                   for j in fetchable]
+        for job, future in zip(fetchable, futures):
+            details = future.result()
+            if details:
+                job.update(details)
+
+    enriched = sum(1 for j in fetchable if j.get("description"))
+    logger.info(f"[ENRICH] {enriched}/{len(fetchable)} jobs have a description.")
+    return jobs
+
+# --- Cycle Checkpoints ---
+
+def _cycle_checkpoint_path(cycle_id):
+    return os.path.join(CYCLE_CHECKPOINT_DIR, f"{cycle_id}.json")
+
+def claim_cycle(cycle_id):
+    """
+    Takes the exclusive lock on a cycle, so only one thread in one process runs or resumes it.
+    Returns the open lock file (close it to release), or None if the cycle is already claimed.
+    The OS drops the lock when its holder dies, so a restart can claim an interrupted cycle.
+    """
+    os.makedirs(CYCLE_CHECKPOINT_DIR, exist_ok=True)
+    lock = open(os.path.join(CYCLE_CHECKPOINT_DIR, f"{cycle_id}.lock"), "a")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+def load_cycle_checkpoint(cycle_id):
+    """Returns the saved checkpoint of a cycle, or None."""
+    try:
+        with open(_cycle_checkpoint_path(cycle_id)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def save_cycle_checkpoint(checkpoint):
+    """Writes the cycle checkpoint atomically, so a restart mid-write never leaves it half-written."""
+    checkpoint["updated_at"] = time.time()
+    path = _cycle_checkpoint_path(checkpoint["cycle_id"])
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.makedirs(CYCLE_CHECKPOINT_DIR, exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.error(f"[CHECKPOINT] Failed to save cycle checkpoint: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def clear_cycle_checkpoint(cycle_id):
+    """Removes a finished cycle's checkpoint and lock file. Call while holding its claim."""
+    for path in (_cycle_checkpoint_path(cycle_id), os.path.join(CYCLE_CHECKPOINT_DIR, f"{cycle_id}.lock")):
+        if os.path.exists(path):
+            os.remove(path)
+
+def new_cycle_checkpoint():
+    now = time.time()
+    return {"cycle_id": uuid.uuid4().hex, "started_at": now, "updated_at": now, "stage": "search",
+            "plan": None, "completed": [], "jobs": [], "applied": []}
+
+def resume_interrupted_cycle():
+    """
+    On startup, resumes cycles interrupted by a restart unless their checkpoint has expired.
+    Runs in every worker; each cycle is claimed first, so only one worker resumes it.
+    """
+    if not os.path.isdir(CYCLE_CHECKPOINT_DIR):
+        return
+    max_age_hours = get_current_config().get("checkpoint_max_age_hours", DEFAULT_CHECKPOINT_MAX_AGE_HOURS)
+    for name in sorted(os.listdir(CYCLE_CHECKPOINT_DIR)):
+        if not name.endswith(".json"):
+            continue
+        cycle_id = name[:-len(".json")]
+        claim = claim_cycle(cycle_id)
+        if claim is None:
+            continue # Still running, or another worker got to it first
+        # Re-read under the claim: the cycle may have finished between listing and claiming
+        checkpoint = load_cycle_checkpoint(cycle_id)
+        if not checkpoint:
+            clear_cycle_checkpoint(cycle_id) # Drop the lock file our claim just recreated
+            claim.close()
+            continue
+        age_hours = (time.time() - checkpoint.get("updated_at", 0)) / 3600
+        if age_hours > max_age_hours:
+            logger.info(f"[CHECKPOINT] Discarding cycle {cycle_id} checkpoint ({age_hours:.1f}h old).")
+            clear_cycle_checkpoint(cycle_id)
+            claim.close()
+            continue
+        logger.info(f"[CHECKPOINT] Resuming cycle {cycle_id} from stage '{checkpoint.get('stage')}'.")
+        threading.Thread(target=bot_cycle, args=(checkpoint, claim), daemon=True).start()
+
 # --- Flask Routes (No changes needed for these, they interact with the config and scraper output) ---
 
 def apply_to_job(job):
@@ -640,11 +1466,40 @@ def apply_to_job(job):
     log_application(job) # Log the attempt
     return False # Indicate that a true application was not performed
 
-def bot_cycle():
-    """Main function to run the job application bot cycle."""
-    logger.info("[BOT] Starting job application cycle...")
-    applied_urls = load_applied_urls()
-    jobs_to_apply = get_jobs()
+def bot_cycle(checkpoint=None, claim=None):
+    """
+    Main function to run the job application bot cycle.
+    State is checkpointed at stage boundaries; pass a saved checkpoint, with the claim taken on it
+    by claim_cycle(), to resume an interrupted cycle.
+    """
+    if checkpoint is None:
+        logger.info("[BOT] Starting job application cycle...")
+        checkpoint = new_cycle_checkpoint()
+        claim = claim_cycle(checkpoint["cycle_id"])
+        save_cycle_checkpoint(checkpoint)
+    else:
+        logger.info(f"[BOT] Resuming job application cycle {checkpoint['cycle_id']}...")
+    try:
+        _run_cycle(checkpoint)
+    finally:
+        if claim:
+            claim.close()
+
+def _run_cycle(checkpoint):
+    """Runs the search and apply stages of a claimed cycle from wherever its checkpoint left off."""
+    applied_urls = load_applied_urls() | set(checkpoint["applied"])
+
+    if checkpoint["stage"] == "search":
+        with profile_stage("search"):
+            jobs_to_apply = get_jobs(applied_urls, checkpoint)
+        # Only new postings need their detail pages; already-applied ones are skipped below anyway
+        with profile_stage("enrich"):
+            enrich_jobs([job for job in jobs_to_apply if job["url"] not in applied_urls])
+        checkpoint["stage"] = "apply"
+        checkpoint["jobs"] = jobs_to_apply
+        save_cycle_checkpoint(checkpoint)
+    else:
+        jobs_to_apply = checkpoint["jobs"]
     
     newly_applied_count = 0
     
@@ -652,124 +1507,601 @@ def bot_cycle():
         if job["url"] not in applied_urls:
             logger.info(f"[BOT] Considering job for 'application': {job.get('title', 'N/A')} at {job.get('company', 'N/A')} - {job.get('url', 'N/A')}")
             # The apply_to_job function now only logs and returns False for actual submission
-            success = apply_to_job(job) 
+            with profile_stage("apply"):
+                success = apply_to_job(job) 
             if success: # This will currently always be False
                 newly_applied_count += 1
             applied_urls.add(job["url"]) # Add to set to prevent re-application in same cycle
-            time.sleep(5)  # Wait between "applications" (logging attempts)
+            checkpoint["applied"].append(job["url"])
+            save_cycle_checkpoint(checkpoint)
+            with profile_stage("sleep"):
+                time.sleep(5)  # Wait between "applications" (logging attempts)
         else:
             logger.info(f"[SKIP] Already logged or applied to: {job.get('url', 'N/A')}")
 
+    clear_cycle_checkpoint(checkpoint["cycle_id"])
     logger.info(f"[BOT] Job application cycle finished. Attempted {newly_applied_count} new job logs (no actual submissions).")
 
 
-@app.route('/webhook', methods=['POST'])
-def receive_tally():
-    data = request.json
-    logger.info("[TALLY] Webhook hit from Tally.so")
-    logger.debug(f"[TALLY DEBUG] Raw incoming data: {json.dumps(data, indent=2)}")
+# --- Background Job Queue ---
 
+def _queue_connect():
+    """Opens a connection to the SQLite job queue, creating the schema on first use in this process."""
+    conn = sqlite3.connect(QUEUE_DB_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    if not _queue_schema_ready:
+        _ensure_queue_schema(conn)
+    return conn
+
+def _ensure_queue_schema(conn):
+    """
+    Creates or migrates the queue schema once per process. Runs in an IMMEDIATE transaction
+    so processes starting together against an older database don't both try the ALTERs.
+    """
+    global _queue_schema_ready
+    with _queue_schema_lock:
+        if _queue_schema_ready:
+            return
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS queue_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    run_after REAL NOT NULL,
+                    locked_at REAL,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            # Columns added for distributed mode; ALTER existing queues created before them
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(queue_jobs)")}
+            for column in ("host", "locked_by"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE queue_jobs ADD COLUMN {column} TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_queue_jobs_ready ON queue_jobs (status, run_after)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_queue_jobs_host ON queue_jobs (host, status)")
+            # Earliest time the next task for a host may start, so politeness holds across all workers
+            conn.execute("CREATE TABLE IF NOT EXISTS host_politeness (host TEXT PRIMARY KEY, next_allowed_at REAL NOT NULL)")
+            # Applied-URL set shared by every worker, so two nodes never apply to the same job
+            conn.execute("CREATE TABLE IF NOT EXISTS applied_urls (url TEXT PRIMARY KEY, applied_at REAL NOT NULL)")
+            # Application log shared by every node (replaces applied_jobs.csv in distributed mode)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS applications (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    title TEXT,
+                    company TEXT,
+                    url TEXT
+                )
+            """)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        _queue_schema_ready = True
+
+_queue_schema_ready = False
+_queue_schema_lock = threading.Lock()
+
+def enqueue_job(kind, payload, idempotency_key, host=None):
+    """
+    Adds a job to the durable queue. Returns True if it was newly queued, False if a job
+    with the same idempotency key already exists (e.g. a retried webhook delivery).
+    Jobs with a host are sharded by it: only one runs per host at a time, spaced by SCRAPE_HOST_DELAY_SECONDS.
+    """
+    now = time.time()
+    conn = _queue_connect()
     try:
-        # Tally webhook data structure: answers is a list of dicts.
-        # Each dict has 'key' (the field ID/name) and 'value'.
-        # We need to map these to more readable names and handle potential data types.
-        
-        parsed_answers = {}
-        for item in data.get("answers", []):
-            field_key = item.get("key")
-            field_value = item.get("value")
-            field_type = item.get("type") # Useful for knowing if it's a file, text, etc.
-            
-            logger.debug(f"[TALLY DEBUG] Processing field: key={field_key}, value={field_value}, type={field_type}")
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO queue_jobs (kind, idempotency_key, payload, host, run_after, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (kind, idempotency_key, json.dumps(payload), host, now, now, now),
+        )
+        created = cursor.rowcount == 1
+    finally:
+        conn.close()
+    if created:
+        ensure_queue_worker()
+        _queue_wakeup.set()
+    return created
+
+def claim_next_job(worker_id):
+    """
+    Atomically claims the oldest runnable job for worker_id. Jobs left 'running' longer than
+    the lease (e.g. the worker died mid-job) become visible again, unless they have used up
+    QUEUE_MAX_ATTEMPTS, in which case they are failed. Jobs whose host already has a task in
+    flight, or was hit less than SCRAPE_HOST_DELAY_SECONDS ago, are passed over.
+    """
+    now = time.time()
+    stale = now - QUEUE_LEASE_SECONDS
+    conn = _queue_connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        # A job that keeps killing its worker never reaches finish_job(); stop re-leasing it
+        conn.execute(
+            "UPDATE queue_jobs SET status = 'failed', last_error = 'Lease expired on final attempt', updated_at = ? "
+            "WHERE status = 'running' AND locked_at < ? AND attempts >= ?",
+            (now, stale, QUEUE_MAX_ATTEMPTS),
+        )
+        row = conn.execute(
+            "SELECT * FROM queue_jobs q "
+            "WHERE ((q.status = 'pending' AND q.run_after <= :now) OR (q.status = 'running' AND q.locked_at < :stale)) "
+            "AND (q.host IS NULL OR ("
+            "  NOT EXISTS (SELECT 1 FROM queue_jobs r WHERE r.host = q.host AND r.status = 'running' "
+            "              AND r.locked_at >= :stale AND r.id != q.id) "
+            "  AND NOT EXISTS (SELECT 1 FROM host_politeness h WHERE h.host = q.host AND h.next_allowed_at > :now))) "
+            "ORDER BY q.id LIMIT 1",
+            {"now": now, "stale": stale},
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE queue_jobs SET status = 'running', attempts = attempts + 1, locked_at = ?, locked_by = ?, updated_at = ? "
+            "WHERE id = ?",
+            (now, worker_id, now, row["id"]),
+        )
+        conn.execute("COMMIT")
+        job = dict(row)
+        job["attempts"] += 1
+        job["locked_by"] = worker_id
+        return job
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+def finish_job(job, error=None):
+    """
+    Marks a claimed job done, or schedules a retry with exponential backoff if it failed.
+    Does nothing if the lease expired and another worker has since claimed the job.
+    """
+    now = time.time()
+    conn = _queue_connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        owned = "WHERE id = ? AND locked_by = ? AND status = 'running'"
+        if error is None:
+            cursor = conn.execute(f"UPDATE queue_jobs SET status = 'done', last_error = NULL, updated_at = ? {owned}",
+                                  (now, job["id"], job["locked_by"]))
+        elif job["attempts"] >= QUEUE_MAX_ATTEMPTS:
+            cursor = conn.execute(f"UPDATE queue_jobs SET status = 'failed', last_error = ?, updated_at = ? {owned}",
+                                  (str(error), now, job["id"], job["locked_by"]))
+        else:
+            run_after = now + QUEUE_RETRY_BACKOFF_SECONDS * (2 ** (job["attempts"] - 1))
+            cursor = conn.execute(f"UPDATE queue_jobs SET status = 'pending', run_after = ?, last_error = ?, updated_at = ? {owned}",
+                                  (run_after, str(error), now, job["id"], job["locked_by"]))
+        if cursor.rowcount == 0:
+            logger.warning(f"[QUEUE] Lease on {job['kind']} job {job['id']} was lost; result discarded.")
+        if job.get("host"):
+            conn.execute(
+                "INSERT INTO host_politeness (host, next_allowed_at) VALUES (?, ?) "
+                "ON CONFLICT(host) DO UPDATE SET next_allowed_at = excluded.next_allowed_at",
+                (job["host"], now + SCRAPE_HOST_DELAY_SECONDS),
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+def purge_finished_jobs(retention_hours):
+    """Deletes done and failed jobs last updated more than retention_hours ago. Returns how many were deleted."""
+    cutoff = time.time() - max(retention_hours, QUEUE_MIN_RETENTION_HOURS) * 3600
+    conn = _queue_connect()
+    try:
+        cursor = conn.execute("DELETE FROM queue_jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (cutoff,))
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+def claim_applied_url(url):
+    """Adds url to the shared applied-URL set. Returns True if this caller is the first to claim it."""
+    conn = _queue_connect()
+    try:
+        cursor = conn.execute("INSERT OR IGNORE INTO applied_urls (url, applied_at) VALUES (?, ?)", (url, time.time()))
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+def release_applied_url(url):
+    """Removes url from the shared applied-URL set, e.g. when the apply that claimed it failed."""
+    conn = _queue_connect()
+    try:
+        conn.execute("DELETE FROM applied_urls WHERE url = ?", (url,))
+    finally:
+        conn.close()
+
+def sync_applied_urls(urls):
+    """Seeds the shared applied-URL set with URLs this node logged in its CSV before distributed mode."""
+    now = time.time()
+    conn = _queue_connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("INSERT OR IGNORE INTO applied_urls (url, applied_at) VALUES (?, ?)", ((u, now) for u in urls))
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+def log_shared_application(ts, job):
+    """Appends an application to the shared log, keeping the last APPLICATION_LOG_MAX_ROWS rows."""
+    conn = _queue_connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "INSERT INTO applications (timestamp, title, company, url) VALUES (?, ?, ?, ?)",
+            (ts, job.get("title", "N/A"), job.get("company", "N/A"), job.get("url", "N/A")),
+        )
+        conn.execute("DELETE FROM applications WHERE id <= (SELECT MAX(id) FROM applications) - ?",
+                     (APPLICATION_LOG_MAX_ROWS,))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+def iter_shared_applications(after_id=0, query=""):
+    """Yields (row_dict, row_id) from the shared application log, oldest first, after a row id."""
+    query = query.lower().strip()
+    conn = _queue_connect()
+    try:
+        # Iterating the cursor fetches lazily, so memory stays flat however long the log is
+        rows = conn.execute("SELECT id, timestamp, title, company, url FROM applications WHERE id > ? ORDER BY id",
+                            (after_id,))
+        for row in rows:
+            record = {field: row[field] for field in APPLIED_JOBS_FIELDS}
+            if query and query not in " ".join(str(v) for v in record.values()).lower():
+                continue
+            yield record, row["id"]
+    finally:
+        conn.close()
+
+def load_shared_applied_urls():
+    """Returns the shared applied-URL set."""
+    conn = _queue_connect()
+    try:
+        return {row["url"] for row in conn.execute("SELECT url FROM applied_urls")}
+    finally:
+        conn.close()
+
+def run_queue_worker(worker_id=None):
+    """Runs queued jobs one at a time, sleeping until woken or the poll interval elapses."""
+    global _queue_worker
+    with _queue_worker_lock:
+        # A standalone worker runs this on the main thread; don't let enqueue_job() start a second one
+        if _queue_worker is None:
+            _queue_worker = threading.current_thread()
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    logger.info(f"[QUEUE] Worker {worker_id} started.")
+    last_purge = float("-inf")
+    while True:
+        try:
+            job = claim_next_job(worker_id)
+        except sqlite3.Error as e:
+            logger.error(f"[QUEUE ERROR] Failed to claim job: {e}")
+            job = None
+        if job is None:
+            # Clean up while idle, at most once per QUEUE_PURGE_INTERVAL_SECONDS
+            if time.monotonic() - last_purge >= QUEUE_PURGE_INTERVAL_SECONDS:
+                last_purge = time.monotonic()
+                retention_hours = get_current_config().get("queue_retention_hours", DEFAULT_QUEUE_RETENTION_HOURS)
+                try:
+                    purged = purge_finished_jobs(retention_hours)
+                    if purged:
+                        logger.info(f"[QUEUE] Purged {purged} finished jobs older than the retention window.")
+                except sqlite3.Error as e:
+                    logger.error(f"[QUEUE ERROR] Failed to purge finished jobs: {e}")
+            _queue_wakeup.wait(timeout=QUEUE_POLL_SECONDS)
+            _queue_wakeup.clear()
+            continue
 
-            if field_key:
-                parsed_answers[field_key] = field_value
+        handler = JOB_HANDLERS.get(job["kind"])
+        logger.info(f"[QUEUE] Running {job['kind']} job {job['id']} (attempt {job['attempts']}).")
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job kind '{job['kind']}'")
+            handler(json.loads(job["payload"]))
+            finish_job(job)
+            logger.info(f"[QUEUE ✅] Finished {job['kind']} job {job['id']}.")
+        except Exception as e:
+            logger.exception(f"[QUEUE ERROR] {job['kind']} job {job['id']} failed.")
+            finish_job(job, error=e)
 
-        logger.debug(f"[TALLY DEBUG] Parsed answers dictionary: {json.dumps(parsed_answers, indent=2)}")
+def ensure_queue_worker():
+    """Starts the background queue worker thread once per process."""
+    global _queue_worker
+    with _queue_worker_lock:
+        if _queue_worker is None or not _queue_worker.is_alive():
+            _queue_worker = threading.Thread(target=run_queue_worker, daemon=True, name="queue-worker")
+            _queue_worker.start()
 
-        # Extract specific fields using .get() for safety
-        # Ensure these 'keys' match the actual 'keys' or 'ids' in your Tally form fields.
-        # For example, if your keywords field in Tally is named 'keywords_input', use that.
-        
-        # Keywords: Expecting a comma-separated string, convert to list
-        keywords_raw = parsed_answers.get("keywords", "") # Assumed Tally field key is 'keywords'
-        new_keywords = [kw.strip() for kw in keywords_raw.split(",") if kw.strip()]
-        logger.info(f"[TALLY] Extracted Keywords: {new_keywords}")
-
-        # Resume URL: Tally file uploads return a list, take the first URL
-        resume_url = ""
-        # Look for a field explicitly named 'resume' or 'resume_file' or similar.
-        # Alternatively, iterate through answers again, checking 'type' == 'file'.
-        for answer_item in data.get("answers", []):
-            if answer_item.get("type") == "file" and answer_item.get("value"):
-                if isinstance(answer_item["value"], list) and answer_item["value"]:
-                    resume_url = answer_item["value"][0]
-                else:
-                    resume_url = answer_item["value"] # Handle single string case
-                logger.info(f"[TALLY] Extracted Resume URL (raw): {resume_url}")
-                break # Assuming only one resume file
-        
-        # Location, Job Type, and other user data
-        new_user_data = {
-            "email": parsed_answers.get("email", ""),         # Assumed Tally field key is 'email'
-            "location": parsed_answers.get("location", ""),   # Assumed Tally field key is 'location'
-            "job_type": parsed_answers.get("job_type", ""),   # Assumed Tally field key is 'job_type'
-            "full_name": parsed_answers.get("full_name", ""), # Assumed Tally field key is 'full_name'
-            "phone": parsed_answers.get("phone", ""),         # Assumed Tally field key is 'phone'
-            "cover_letter": parsed_answers.get("cover_letter", "") # Assumed Tally field key is 'cover_letter'
-        }
-        logger.info(f"[TALLY] Extracted User Data: {new_user_data}")
+_queue_wakeup = threading.Event()
+_queue_worker = None
+_queue_worker_lock = threading.Lock()
 
-        # Ensure resumes directory exists
-        if not os.path.exists("resumes"):
-            os.makedirs("resumes")
-            logger.info("Created 'resumes' directory.")
+# --- Distributed Execution ---
 
-        # Determine the target resume path
-        current_resume_path = os.path.join("resumes", "resume.pdf")
+def import_local_applied_urls():
+    """
+    On startup in distributed mode, adds URLs from this node's pre-distributed applied_jobs.csv
+    to the shared applied set. New applications are only logged to the shared database.
+    """
+    if distributed_mode() and os.path.exists(CSV_PATH):
+        sync_applied_urls(load_csv_applied_urls())
 
-        # Download the resume file from Tally
-        if resume_url and "localhost" not in resume_url: # Avoid attempting to download local URLs
-            logger.info(f"Attempting to download resume from: {resume_url}")
-            download_success = False
-            for attempt in range(3):
-                try:
-                    response = requests.get(resume_url, timeout=30)
-                    response.raise_for_status() # Check for HTTP errors
-                    with open(current_resume_path, "wb") as f:
-                        f.write(response.content)
-                    logger.info(f"[TALLY ✅] Resume downloaded to {current_resume_path}")
-                    download_success = True
-                    break # Exit loop on success
-                except requests.exceptions.RequestException as e:
-                    logger.warning(f"[TALLY RETRY] Resume download attempt {attempt + 1} failed: {e}")
-            if not download_success:
-                logger.warning(f"[TALLY] Falling back to default resume due to download failure.")
-                current_resume_path = DEFAULT_RESUME_PATH
+def start_bot_cycle(profile=None):
+    """
+    Starts a bot cycle: in a local thread, or as a queued task when config['distributed'] is set.
+    profile ("sample" or "pstats"), or config['profile_cycles'], runs the local cycle under the profiler.
+    """
+    config = get_current_config()
+    profile = profile or config.get("profile_cycles")
+    if config.get("distributed"):
+        if profile:
+            logger.warning("[PROFILE] Profiling is only supported for local cycles; running unprofiled.")
+        enqueue_job("cycle", {}, f"cycle:{uuid.uuid4().hex}")
+        logger.info("[BOT] Queued distributed bot cycle.")
+    elif profile:
+        mode = profile if profile in ("sample", "pstats") else "sample"
+        threading.Thread(target=run_profiled_cycle, args=(mode,), daemon=True).start()
+    else:
+        threading.Thread(target=bot_cycle, daemon=True).start()
+
+def process_cycle_task(payload):
+    """Queue handler: plans the cycle and fans it out into one scrape task per source x query."""
+    config = get_current_config()
+    keywords_from_config = [kw.lower().strip() for kw in config.get("keywords", []) if kw.strip()]
+    location_param = config.get("user_data", {}).get("location", "United States")
+
+    cycle_id = uuid.uuid4().hex
+    plan = plan_queries([keywords_from_config], location_param, load_query_stats(), config.get("query_budget"))
+    for source, query, location in plan:
+        # Scrapers fetch the first results page only; the page number keeps the key stable if that changes
+        enqueue_job(
+            "scrape",
+            {"source": source, "query": query, "location": location, "page": 1, "cycle_id": cycle_id},
+            f"scrape:{cycle_id}:{source}:{query}:{location}:1",
+            host=SOURCE_CAPABILITIES[source]["host"],
+        )
+    logger.info(f"[BOT] Cycle {cycle_id} queued {len(plan)} scrape tasks.")
+
+def process_scrape_task(payload):
+    """Queue handler: runs one source query and queues an apply task for each job not yet applied to."""
+    jobs = SOURCE_CAPABILITIES[payload["source"]]["call"](payload["query"], payload["location"])
+    if jobs is None:
+        raise RuntimeError(f"{payload['source']} '{payload['query']}' request failed") # Let the queue retry it
+    applied_urls = load_shared_applied_urls()
+    queued = 0
+    for job in jobs:
+        url = job.get("url", "N/A")
+        if not url.startswith("http") or url in applied_urls:
+            continue
+        # Keyed by cycle and canonical URL, so the same posting from another source or query is queued
+        # once per cycle. Across cycles the applied-URL claim dedupes, and a posting whose apply failed
+        # for good is queued again next cycle, as in local mode.
+        if enqueue_job("apply", {"job": job}, f"apply:{payload.get('cycle_id', '')}:{canonicalize_url(url)}",
+                       host=urllib.parse.urlsplit(url).netloc.lower()):
+            queued += 1
+    logger.info(f"[BOT] {payload['source']} '{payload['query']}' queued {queued} new jobs.")
+
+def process_apply_task(payload):
+    """
+    Queue handler: claims the job URL in the shared applied set, enriches it and applies.
+    The claim is released if the apply fails, so the queue's retry can apply again.
+    """
+    job = payload["job"]
+    if not claim_applied_url(job["url"]):
+        logger.info(f"[SKIP] Already logged or applied to: {job.get('url', 'N/A')}")
+        return
+    try:
+        config = get_current_config()
+        details = fetch_job_details(job["url"], config.get("detail_cache_ttl_hours", DEFAULT_DETAIL_CACHE_TTL_HOURS))
+        if details:
+            job.update(details)
+        apply_to_job(job)
+    except Exception:
+        release_applied_url(job["url"])
+        raise
+
+# --- Tally Webhook Processing ---
+
+def parse_tally_submission(data):
+    """Extracts keywords, resume URL and user data from a Tally webhook payload."""
+    # Tally webhook data structure: answers is a list of dicts.
+    # Each dict has 'key' (the field ID/name) and 'value'.
+    # We need to map these to more readable names and handle potential data types.
+
+    parsed_answers = {}
+    for item in data.get("answers", []):
+        field_key = item.get("key")
+        field_value = item.get("value")
+        field_type = item.get("type") # Useful for knowing if it's a file, text, etc.
+
+        logger.debug(f"[TALLY DEBUG] Processing field: key={field_key}, value={field_value}, type={field_type}")
+
+        if field_key:
+            parsed_answers[field_key] = field_value
+
+    logger.debug(f"[TALLY DEBUG] Parsed answers dictionary: {json.dumps(parsed_answers, indent=2)}")
+
+    # Extract specific fields using .get() for safety
+    # Ensure these 'keys' match the actual 'keys' or 'ids' in your Tally form fields.
+    # For example, if your keywords field in Tally is named 'keywords_input', use that.
+
+    # Keywords: Expecting a comma-separated string, convert to list
+    keywords_raw = parsed_answers.get("keywords", "") or "" # Assumed Tally field key is 'keywords'
+    new_keywords = [kw.strip() for kw in keywords_raw.split(",") if kw.strip()]
+    logger.info(f"[TALLY] Extracted Keywords: {new_keywords}")
+
+    # Resume URL: Tally file uploads return a list, take the first URL
+    resume_url = ""
+    # Look for a field explicitly named 'resume' or 'resume_file' or similar.
+    # Alternatively, iterate through answers again, checking 'type' == 'file'.
+    for answer_item in data.get("answers", []):
+        if answer_item.get("type") == "file" and answer_item.get("value"):
+            if isinstance(answer_item["value"], list) and answer_item["value"]:
+                resume_url = answer_item["value"][0]
+            else:
+                resume_url = answer_item["value"] # Handle single string case
+            logger.info(f"[TALLY] Extracted Resume URL (raw): {resume_url}")
+            break # Assuming only one resume file
+
+    # Location, Job Type, and other user data
+    new_user_data = {
+        "email": parsed_answers.get("email", ""),         # Assumed Tally field key is 'email'
+        "location": parsed_answers.get("location", ""),   # Assumed Tally field key is 'location'
+        "job_type": parsed_answers.get("job_type", ""),   # Assumed Tally field key is 'job_type'
+        "full_name": parsed_answers.get("full_name", ""), # Assumed Tally field key is 'full_name'
+        "phone": parsed_answers.get("phone", ""),         # Assumed Tally field key is 'phone'
+        "cover_letter": parsed_answers.get("cover_letter", "") # Assumed Tally field key is 'cover_letter'
+    }
+    logger.info(f"[TALLY] Extracted User Data: {new_user_data}")
+
+    return new_keywords, resume_url, new_user_data
+
+def _resume_blob_path(digest):
+    """Content-addressed location for a resume, sharded by the first two hex digits of its SHA-256."""
+    return os.path.join(RESUME_STORE_DIR, digest[:2], f"{digest}.pdf")
+
+def store_resume_from_url(resume_url):
+    """
+    Streams a resume to disk in chunks, hashing it while writing, and stores it under its
+    SHA-256 so identical uploads are kept once. Raises ValueError if it exceeds RESUME_MAX_BYTES.
+    Returns the path of the stored resume.
+    """
+    import requests
+
+    os.makedirs(RESUME_STORE_DIR, exist_ok=True)
+    tmp_path = os.path.join(RESUME_STORE_DIR, f"{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with requests.get(resume_url, timeout=30, stream=True) as response:
+            response.raise_for_status() # Check for HTTP errors
+            declared_size = int(response.headers.get("Content-Length") or 0)
+            if declared_size > RESUME_MAX_BYTES:
+                raise ValueError(f"Resume is {declared_size} bytes, over the {RESUME_MAX_BYTES} byte limit")
+            with open(tmp_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=RESUME_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > RESUME_MAX_BYTES:
+                        raise ValueError(f"Resume exceeded the {RESUME_MAX_BYTES} byte limit")
+                    digest.update(chunk)
+                    f.write(chunk)
+
+        blob_path = _resume_blob_path(digest.hexdigest())
+        if os.path.exists(blob_path):
+            logger.info(f"[RESUME] Identical resume already stored at {blob_path}.")
         else:
-            logger.warning(f"[TALLY] No valid resume URL from webhook or URL is local. Falling back to default resume.")
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(tmp_path, blob_path)
+            logger.info(f"[RESUME] Stored {size} byte resume at {blob_path}.")
+        return blob_path
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def process_tally_submission(payload):
+    """Queue handler: downloads the resume, saves the new config and triggers a bot cycle."""
+    import requests
+
+    new_keywords, resume_url, new_user_data = parse_tally_submission(payload["data"])
+
+    # Ensure resumes directory exists
+    if not os.path.exists("resumes"):
+        os.makedirs("resumes")
+        logger.info("Created 'resumes' directory.")
+
+    # Download the resume file from Tally
+    current_resume_path = None
+    if resume_url and "localhost" not in resume_url: # Avoid attempting to download local URLs
+        logger.info(f"Attempting to download resume from: {resume_url}")
+        for attempt in range(3):
+            try:
+                current_resume_path = store_resume_from_url(resume_url)
+                logger.info(f"[TALLY ✅] Resume downloaded to {current_resume_path}")
+                break # Exit loop on success
+            except ValueError as e:
+                logger.warning(f"[TALLY] Rejected resume: {e}")
+                break # Retrying won't make the file smaller
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"[TALLY RETRY] Resume download attempt {attempt + 1} failed: {e}")
+        if not current_resume_path:
+            logger.warning(f"[TALLY] Falling back to default resume due to download failure.")
             current_resume_path = DEFAULT_RESUME_PATH
+    else:
+        logger.warning(f"[TALLY] No valid resume URL from webhook or URL is local. Falling back to default resume.")
+        current_resume_path = DEFAULT_RESUME_PATH
+
+    # Update global config (or create if not exists)
+    global config # Indicate we're modifying the global config
+    config = get_current_config() # Start from what's on disk, not the copy loaded at startup
+    config["timestamp"] = str(datetime.utcnow())
+    config["keywords"] = new_keywords
+    config["resume_path"] = current_resume_path # Update to the *chosen* resume path
+    config["user_data"] = new_user_data
+
+    # Save config to file
+    with open(CONFIG_FILE, "w") as f:
+        json.dump(config, f, indent=2)
+    logger.info("[TALLY] Config updated and saved to config.json.")
+
+    # Launch job application cycle in a separate thread (or on the shared queue in distributed mode)
+    start_bot_cycle()
+
+JOB_HANDLERS = {
+    "tally_submission": process_tally_submission,
+    "cycle": process_cycle_task,
+    "scrape": process_scrape_task,
+    "apply": process_apply_task,
+}
+
+def tally_idempotency_key(data, raw_body):
+    """Stable key for a Tally delivery: its event/response ID, or a hash of the raw body as a fallback."""
+    for key in ("eventId", "responseId", "submissionId"):
+        if data.get(key):
+            return f"tally:{data[key]}"
+    nested = data.get("data")
+    if isinstance(nested, dict):
+        for key in ("responseId", "submissionId"):
+            if nested.get(key):
+                return f"tally:{nested[key]}"
+    return "tally:sha256:" + hashlib.sha256(raw_body).hexdigest()
 
-        # Update global config (or create if not exists)
-        global config # Indicate we're modifying the global config
-        config["timestamp"] = str(datetime.utcnow())
-        config["keywords"] = new_keywords
-        config["resume_path"] = current_resume_path # Update to the *chosen* resume path
-        config["user_data"] = new_user_data
-        
-        # Save config to file
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(config, f, indent=2)
-        logger.info("[TALLY] Config updated and saved to config.json.")
+@app.route('/webhook', methods=['POST'])
+def receive_tally():
+    data = request.get_json(silent=True)
+    logger.info("[TALLY] Webhook hit from Tally.so")
+    logger.debug(f"[TALLY DEBUG] Raw incoming data: {json.dumps(data, indent=2)}")
 
-        # Launch job application cycle in a separate thread
-        threading.Thread(target=bot_cycle, daemon=True).start()
-        return "Success", 200
+    answers = data.get("answers", []) if isinstance(data, dict) else None
+    if not isinstance(answers, list) or not all(isinstance(answer, dict) for answer in answers):
+        logger.warning("[TALLY] Rejected webhook with missing or malformed JSON body.")
+        return "Invalid payload", 400
 
-    except Exception as e:
-        logger.exception("[TALLY ERROR] An unexpected error occurred in webhook processing.")
+    # Acknowledge right away; the download, config update and cycle run on the queue worker.
+    # Tally retries deliveries that time out, so deduplicate on the idempotency key.
+    idempotency_key = tally_idempotency_key(data, request.get_data())
+    try:
+        created = enqueue_job("tally_submission", {"data": data}, idempotency_key)
+    except sqlite3.Error:
+        logger.exception("[TALLY ERROR] Failed to enqueue webhook submission.")
         return "Error", 500
 
+    if not created:
+        logger.info(f"[TALLY] Duplicate delivery {idempotency_key} ignored.")
+    return "Accepted", 202
+
 # --- Web Interface Routes ---
 
 # Simple HTML template for the UI
@@ -804,6 +2136,9 @@ UI_HTML = """
         .job-item a:hover { text-decoration: underline; }
         .success { color: green; }
         .error { color: red; }
+        table { width: 100%; border-collapse: collapse; font-size: 0.9em; }
+        th, td { text-align: left; padding: 0.4em; border-bottom: 1px solid #ddd; }
+        td a { color: #007bff; text-decoration: none; }
     </style>
 </head>
 <body>
@@ -813,8 +2148,34 @@ UI_HTML = """
         <h2>Current Configuration</h2>
         <pre>{{ config_json }}</pre>
 
-        <h2>Latest Applied Jobs</h2>
-        <pre>{{ applied_jobs_csv }}</pre>
+        <h2>Applied Jobs</h2>
+        <form action="/" method="get">
+            <input type="text" name="q" value="{{ query }}" placeholder="Filter by title, company or URL">
+            <button type="submit">Filter</button>
+        </form>
+        {% if jobs %}
+        <table>
+            <tr><th>Timestamp</th><th>Title</th><th>Company</th><th>URL</th></tr>
+            {% for job in jobs %}
+            <tr>
+                <td>{{ job.timestamp }}</td>
+                <td>{{ job.title }}</td>
+                <td>{{ job.company }}</td>
+                <td><a href="{{ job.url }}" target="_blank">link</a></td>
+            </tr>
+            {% endfor %}
+        </table>
+        {% else %}
+        <p>No applied jobs data available yet.</p>
+        {% endif %}
+        {% if next_cursor %}
+        <a class="button" href="/?after={{ next_cursor }}&limit={{ limit }}&q={{ query|urlencode }}">Next page</a>
+        {% endif %}
+        <p>
+            Download: <a href="/applied_jobs.csv">CSV</a> |
+            <a href="/applied_jobs.json">JSON</a> |
+            <a href="/applied_jobs.ndjson">NDJSON</a>
+        </p>
 
         <form action="/run_bot" method="post">
             <button type="submit" class="button">Run Bot Now</button>
@@ -835,12 +2196,19 @@ def index():
     current_config = get_current_config()
     config_json = json.dumps(current_config, indent=2)
 
-    applied_jobs_data = ""
-    if os.path.exists(CSV_PATH):
-        with open(CSV_PATH, 'r') as f:
-            applied_jobs_data = f.read()
-    else:
-        applied_jobs_data = "No applied jobs data available yet."
+    # Cursor-based paging: `after` is the CSV byte offset returned as next_cursor on the previous page
+    query = request.args.get("q", "")
+    limit = min(max(request.args.get("limit", HISTORY_PAGE_SIZE, type=int), 1), HISTORY_MAX_PAGE_SIZE)
+    after = request.args.get("after", 0, type=int)
+
+    jobs, next_cursor = [], None
+    for row, offset in iter_applied_jobs(after, query):
+        if len(jobs) == limit:
+            # There is at least one more row, so the offset after this page's last row is the next cursor
+            next_cursor = cursor
+            break
+        jobs.append(row)
+        cursor = offset
 
     # Get the base URL for the webhook
     # In a production environment, this would be your public domain.
@@ -851,28 +2219,98 @@ def index():
     return render_template_string(
         UI_HTML,
         config_json=config_json,
-        applied_jobs_csv=applied_jobs_data,
+        jobs=jobs,
+        next_cursor=next_cursor,
+        limit=limit,
+        query=query,
         webhook_url=webhook_url
     )
 
+def _stream_applied_jobs(fmt, query=""):
+    """Generates the applied jobs log in the given format one row at a time."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(APPLIED_JOBS_FIELDS)
+        yield buffer.getvalue()
+        for row, _ in iter_applied_jobs(query=query):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow([row.get(field, "") for field in APPLIED_JOBS_FIELDS])
+            yield buffer.getvalue()
+    elif fmt == "json":
+        yield "["
+        separator = ""
+        for row, _ in iter_applied_jobs(query=query):
+            yield separator + json.dumps(row)
+            separator = ","
+        yield "]"
+    else:
+        for row, _ in iter_applied_jobs(query=query):
+            yield json.dumps(row) + "\n"
+
+@app.route('/applied_jobs.<fmt>')
+def download_applied_jobs(fmt):
+    if fmt not in HISTORY_MIMETYPES:
+        return "Unsupported format.", 404
+    # Chunked response generated row by row, so memory stays flat however large the log gets
+    response = Response(
+        stream_with_context(_stream_applied_jobs(fmt, request.args.get("q", ""))),
+        mimetype=HISTORY_MIMETYPES[fmt],
+    )
+    response.headers["Content-Disposition"] = f"attachment; filename=applied_jobs.{fmt}"
+    return response
+
 @app.route('/run_bot', methods=['POST'])
 def run_bot_endpoint():
     logger.info("[UI] Manual bot run requested via UI.")
-    threading.Thread(target=bot_cycle, daemon=True).start()
+    # ?profile=1 or ?profile=sample (sampled collapsed stacks), or ?profile=pstats (cProfile), profiles this one cycle
+    profile = PROFILE_MODES.get(request.args.get("profile"))
+    start_bot_cycle(profile=profile)
+    if profile:
+        return "Profiled bot cycle initiated. Results will be listed at /profiles.", 202
     return "Bot cycle initiated. Check server logs for progress.", 202
 
+@app.route('/profiles')
+def list_profiles():
+    if not os.path.isdir(PROFILE_DIR):
+        return {"profiles": []}
+    return {"profiles": sorted(os.listdir(PROFILE_DIR), reverse=True)}
+
+@app.route('/profiles/<path:filename>')
+def download_profile(filename):
+    return send_from_directory(os.path.abspath(PROFILE_DIR), filename, as_attachment=True)
+
 @app.route('/download_resume')
 def download_resume():
     config = get_current_config()
     resume_path = config.get("resume_path", DEFAULT_RESUME_PATH)
     if os.path.exists(resume_path):
-        return send_file(resume_path, as_attachment=True, download_name="current_resume.pdf")
+        # Stored resumes are named by their SHA-256, which makes a strong ETag for free.
+        # send_file hands the file to the server's sendfile path and handles Range/If-None-Match.
+        blob_name = os.path.splitext(os.path.basename(resume_path))[0]
+        is_blob = os.path.abspath(resume_path) == os.path.abspath(_resume_blob_path(blob_name))
+        return send_file(
+            os.path.abspath(resume_path), # send_file resolves relative paths against the app root, not the cwd
+            as_attachment=True,
+            download_name="current_resume.pdf",
+            conditional=True,
+            etag=blob_name if is_blob else True,
+        )
     return "Resume not found.", 404
 
 # --- Main execution ---
 if __name__ == '__main__':
+    if sys.argv[1:2] == ["worker"]:
+        # Standalone queue worker for distributed mode; run as many of these as needed
+        load_initial_config()
+        ensure_default_resume()
+        import_local_applied_urls()
+        run_queue_worker()
+        sys.exit(0)
+
     # You might want to run this with gunicorn in production
     # For development, this is fine
-    app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False) 
+    create_app().run(host='0.0.0.0', port=5000, debug=True, use_reloader=False) 
     # use_reloader=False because the bot_cycle runs in a separate thread
     # and reloader might cause issues.